@@ -0,0 +1,69 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, orjson, to_builtin
+from api.middleware import brotli
+from api.utils.chart_utils import build_chart_json
+from api.utils.synthetic_data import make_synthetic_dataset
+
+
+def _response_shapes(df):
+    """Builds the single-area and comparison payloads query_view returns."""
+    areas = df['final location'].unique().tolist()
+    first = df[df['final location'] == areas[0]]
+
+    single = {
+        "area": areas[0].title(),
+        "summary": "Market Analysis Report for: " + areas[0].title(),
+        "chart": build_chart_json(first),
+        "table": first.fillna("").to_dict(orient="records"),
+    }
+    comparison = {
+        "comparison_areas": [a.title() for a in areas],
+        "summary": f"Comparison analysis for: {', '.join(a.title() for a in areas)}",
+        "multi_chart_data": [
+            {"area": a.title(), "chart": build_chart_json(df[df['final location'] == a])}
+            for a in areas
+        ],
+        "table": [],
+    }
+    return {"single": single, "comparison": comparison}
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat * 1000, out
+
+
+class Command(BaseCommand):
+    help = "Benchmarks JSON rendering and compression on /api/query/ response shapes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows-per-year", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        df = make_synthetic_dataset(rows_per_year=options["rows_per_year"])
+        repeat = options["repeat"]
+        stock, fast = JSONRenderer(), FastJSONRenderer()
+
+        self.stdout.write(f"orjson: {'yes' if orjson else 'no'}, brotli: {'yes' if brotli else 'no'}")
+        for name, payload in _response_shapes(df).items():
+            # The stock renderer cannot handle NumPy arrays, so it pays for the conversion too
+            stock_ms, body = _time(lambda: stock.render(to_builtin(payload)), repeat)
+            fast_ms, _ = _time(lambda: fast.render(payload), repeat)
+            gzip_ms, gz = _time(lambda: gzip.compress(body, compresslevel=6), repeat)
+
+            line = (
+                f"{name:<11} {len(body):>9,} B  stock {stock_ms:7.2f} ms  fast {fast_ms:7.2f} ms  "
+                f"gzip {len(gz):>8,} B / {gzip_ms:6.2f} ms"
+            )
+            if brotli is not None:
+                br_ms, br = _time(lambda: brotli.compress(body, quality=5), repeat)
+                line += f"  br {len(br):>8,} B / {br_ms:6.2f} ms"
+            self.stdout.write(line)
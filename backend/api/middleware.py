@@ -0,0 +1,89 @@
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+# Brotli is optional; without it we only negotiate gzip.
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+_ENCODING_RE = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Parses an Accept-Encoding header into {encoding: q-value}."""
+    accepted = {}
+    for part in header.split(","):
+        match = _ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            q = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            q = 0.0
+        accepted[match.group(1).lower()] = q
+    return accepted
+
+
+def _choose_encoding(header: str):
+    """Picks the best encoding we support, preferring brotli on ties."""
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses non-streaming responses larger than
+    RESPONSE_COMPRESSION_MIN_SIZE bytes with brotli or gzip, depending on
+    what the client accepts. Streaming responses are left untouched so
+    they can be flushed incrementally.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "RESPONSE_COMPRESSION_MIN_SIZE", DEFAULT_MIN_SIZE)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = _choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(response.content, quality=5)
+        else:
+            compressed = compress_string(response.content)
+
+        # Only bother if compression actually saves space
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = encoding
+
+        # Compressed bodies differ from the original, so strong ETags no longer apply
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+
+        return response
@@ -0,0 +1,79 @@
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from rest_framework.renderers import JSONRenderer
+
+# orjson is optional: it is much faster than the stdlib encoder and
+# serializes numpy arrays natively, but we fall back cleanly without it.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(obj):
+    """Converts NumPy/pandas values that the encoder does not know about."""
+    if obj is None or obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+    if isinstance(obj, (np.ndarray, pd.Series, pd.Index)):
+        return [to_builtin(v) for v in obj.tolist()]
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="records")
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_builtin(obj):
+    """
+    Recursively converts a response payload into plain Python types.
+    NaN/inf become None so the output is always valid JSON.
+    """
+    if isinstance(obj, dict):
+        return {str(k): to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [to_builtin(v) for v in obj]
+    if isinstance(obj, float):
+        # Also catches np.float64, which subclasses float
+        return float(obj) if math.isfinite(obj) else None
+    if isinstance(obj, (bool, int, str)) or obj is None:
+        return obj.item() if isinstance(obj, np.generic) else obj
+    return to_builtin(_default(obj))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer.
+
+    Uses orjson when installed (with native NumPy support) and otherwise
+    coerces NumPy/pandas values to builtins before handing off to the
+    stock renderer, so views can return aggregation results directly.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if orjson is None:
+            return super().render(to_builtin(data), accepted_media_type, renderer_context)
+
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=_default, option=option)
+        except TypeError:
+            # e.g. non-contiguous or object-dtype arrays orjson refuses
+            return orjson.dumps(to_builtin(data), option=option)
@@ -0,0 +1,38 @@
+from django.http import StreamingHttpResponse
+
+from .renderers import FastJSONRenderer
+
+# Supported wire formats for progressive responses
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+_renderer = FastJSONRenderer()
+
+
+def encode_event(event: str, data, fmt: str) -> bytes:
+    """Encodes one event as an NDJSON line or an SSE frame."""
+    if fmt == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + _renderer.render(data) + b"\n\n"
+    return _renderer.render({"event": event, "data": data}) + b"\n"
+
+
+def stream_events(events, fmt: str) -> StreamingHttpResponse:
+    """
+    Wraps an iterator of (event, data) pairs in a StreamingHttpResponse.
+    An exception raised mid-stream is reported as a final 'error' event,
+    since the status line has already been sent by then.
+    """
+    def generate():
+        try:
+            for event, data in events:
+                yield encode_event(event, data, fmt)
+        except Exception as e:
+            yield encode_event("error", {"error": f"Query failed: {e}"}, fmt)
+
+    response = StreamingHttpResponse(generate(), content_type=STREAM_FORMATS[fmt])
+    # Keep proxies (e.g. nginx in front of gunicorn) from buffering the stream
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
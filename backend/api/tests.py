@@ -0,0 +1,377 @@
+import gzip
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from . import middleware, renderers
+from .middleware import CompressionMiddleware, _choose_encoding
+from .renderers import FastJSONRenderer, to_builtin
+from .utils import excel_reader
+from .utils.synthetic_data import make_synthetic_dataset
+from .views import MAX_BATCH_QUERIES
+
+
+class DatasetTestCase(SimpleTestCase):
+    """Points excel_reader at a temporary data directory with no uploads."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name)
+        self.addCleanup(self.tmp.cleanup)
+        excel_reader._DATASET_CACHE.clear()
+        self.addCleanup(excel_reader._DATASET_CACHE.clear)
+
+        # No uploads unless a test creates one
+        uploads = tuple(self.data_dir / f"uploaded_dataset{suffix}" for suffix in (".xlsx", ".xls", ".csv", ".zip"))
+        for name, value in (("UPLOADED_PATHS", uploads), ("UPLOADED_DIR", self.data_dir / "uploaded_dataset")):
+            patcher = mock.patch.object(excel_reader, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _use_preloaded(self, path):
+        for name, value in (("PRELOADED_PATH", path), ("PRELOADED_DIR", self.data_dir / "missing_dir")):
+            patcher = mock.patch.object(excel_reader, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _use_synthetic_dataset(self, **kwargs):
+        """Serves make_synthetic_dataset(**kwargs) as the preloaded dataset."""
+        path = self.data_dir / "dataset.csv"
+        make_synthetic_dataset(**kwargs).to_csv(path, index=False)
+        self._use_preloaded(path)
+
+
+class LoadDatasetTests(DatasetTestCase):
+    """Regression tests for load_dataset() source handling."""
+
+    def test_loads_shipped_workbook(self):
+        df = excel_reader.load_dataset()
+
+        self.assertFalse(df.empty)
+        self.assertIn("final location", df.columns)
+        self.assertEqual(len(df.attrs["load_timings"]), 1)
+
+    def test_loads_every_sheet_of_workbook(self):
+        path = self.data_dir / "two_sheets.xlsx"
+        first = make_synthetic_dataset(areas=["wakad"], rows_per_year=2)
+        second = make_synthetic_dataset(areas=["aundh"], rows_per_year=3)
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            first.to_excel(writer, sheet_name="Wakad", index=False)
+            second.to_excel(writer, sheet_name="Aundh", index=False)
+        self._use_preloaded(path)
+
+        df = excel_reader.load_dataset()
+
+        self.assertEqual(len(df), len(first) + len(second))
+        self.assertEqual(set(df["final location"]), {"wakad", "aundh"})
+        self.assertEqual([t["part"] for t in df.attrs["load_timings"]], ["two_sheets.xlsx[Wakad]", "two_sheets.xlsx[Aundh]"])
+
+    def test_loads_zip_of_csv_files(self):
+        path = self.data_dir / "parts.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            for area in ("wakad", "baner"):
+                zf.writestr(f"{area}.csv", make_synthetic_dataset(areas=[area], rows_per_year=1).to_csv(index=False))
+        self._use_preloaded(path)
+
+        df = excel_reader.load_dataset()
+
+        self.assertEqual(set(df["final location"]), {"wakad", "baner"})
+
+    def test_partial_load_is_not_cached(self):
+        path = self.data_dir / "parts.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("good.csv", make_synthetic_dataset(areas=["wakad"], rows_per_year=1).to_csv(index=False))
+            zf.writestr("broken.xlsx", b"not a workbook")
+        self._use_preloaded(path)
+
+        df = excel_reader.load_dataset()
+
+        self.assertEqual(set(df["final location"]), {"wakad"})
+        self.assertEqual(excel_reader._DATASET_CACHE, {})
+
+    def test_replaced_file_invalidates_cache(self):
+        self._use_synthetic_dataset(areas=["wakad"], rows_per_year=1)
+        first = excel_reader.load_dataset()
+
+        replacement = self.data_dir / "next.csv"
+        make_synthetic_dataset(areas=["aundh"], rows_per_year=1).to_csv(replacement, index=False)
+        os.replace(replacement, self.data_dir / "dataset.csv")
+        second = excel_reader.load_dataset()
+
+        self.assertEqual(set(first["final location"]), {"wakad"})
+        self.assertEqual(set(second["final location"]), {"aundh"})
+        self.assertNotEqual(first.attrs["dataset_version"], second.attrs["dataset_version"])
+
+    def test_reloads_when_source_changes_during_read(self):
+        self._use_synthetic_dataset(areas=["wakad"], rows_per_year=1)
+        path = self.data_dir / "dataset.csv"
+        snapshot = excel_reader._snapshot_source
+        calls = []
+
+        def snapshot_then_replace(source):
+            result = snapshot(source)
+            if not calls:
+                # An upload lands right after the first read
+                replacement = self.data_dir / "next.csv"
+                make_synthetic_dataset(areas=["aundh"], rows_per_year=1).to_csv(replacement, index=False)
+                os.replace(replacement, path)
+            calls.append(source)
+            return result
+
+        with mock.patch.object(excel_reader, "_snapshot_source", snapshot_then_replace):
+            df = excel_reader.load_dataset()
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(set(df["final location"]), {"aundh"})
+        self.assertEqual(df.attrs["dataset_version"], excel_reader._source_version(path))
+
+    def test_uploaded_csv_is_read_as_csv(self):
+        self._use_preloaded(self.data_dir / "missing.xlsx")
+        make_synthetic_dataset(areas=["hinjewadi"], rows_per_year=1).to_csv(self.data_dir / "uploaded_dataset.csv", index=False)
+
+        df = excel_reader.load_dataset()
+
+        self.assertEqual(set(df["final location"]), {"hinjewadi"})
+
+    def test_validate_rejects_unreadable_upload(self):
+        path = self.data_dir / "uploaded_dataset.xlsx"
+        path.write_text("final location,year\nwakad,2020\n")
+
+        self.assertIsNotNone(excel_reader.validate_dataset_source(path))
+
+
+class ChooseEncodingTests(SimpleTestCase):
+    """Accept-Encoding negotiation in CompressionMiddleware."""
+
+    def setUp(self):
+        patcher = mock.patch.object(middleware, "brotli", mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_prefers_brotli_on_tie(self):
+        self.assertEqual(_choose_encoding("gzip, deflate, br"), "br")
+
+    def test_higher_q_wins(self):
+        self.assertEqual(_choose_encoding("br;q=0.5, gzip;q=0.9"), "gzip")
+
+    def test_q_zero_refuses_encoding(self):
+        self.assertEqual(_choose_encoding("br;q=0, gzip"), "gzip")
+        self.assertIsNone(_choose_encoding("br;q=0, gzip;q=0"))
+
+    def test_wildcard_covers_unlisted_encodings(self):
+        self.assertEqual(_choose_encoding("*"), "br")
+        self.assertEqual(_choose_encoding("br;q=0, *;q=0.5"), "gzip")
+
+    def test_identity_only(self):
+        self.assertIsNone(_choose_encoding(""))
+        self.assertIsNone(_choose_encoding("identity"))
+
+    def test_falls_back_to_gzip_without_brotli(self):
+        with mock.patch.object(middleware, "brotli", None):
+            self.assertEqual(_choose_encoding("br, gzip"), "gzip")
+            self.assertIsNone(_choose_encoding("br"))
+
+
+@override_settings(RESPONSE_COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = json.dumps({"rows": [{"area": "wakad", "rate": 1234.5}] * 50}).encode()
+
+    def _get(self, response, accept="gzip"):
+        request = RequestFactory().get("/api/areas/", HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda r: response)(request)
+
+    def test_compresses_large_bodies(self):
+        response = self._get(HttpResponse(self.body))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_skips_bodies_below_min_size(self):
+        response = self._get(HttpResponse(b"x" * 99))
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b"x" * 99)
+
+    def test_skips_streaming_responses(self):
+        response = self._get(StreamingHttpResponse(iter([self.body])))
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_leaves_body_alone_when_client_refuses(self):
+        response = self._get(HttpResponse(self.body), accept="identity")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.body)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    payload = {
+        "rates": np.array([1.5, np.nan, np.inf]),
+        "demand": np.array([1, 2], dtype="int64"),
+        "count": np.int64(3),
+        "mean": np.float64(2.25),
+        "flag": np.bool_(True),
+        "missing": pd.NA,
+        "plain": float("nan"),
+    }
+    expected = {
+        "rates": [1.5, None, None],
+        "demand": [1, 2],
+        "count": 3,
+        "mean": 2.25,
+        "flag": True,
+        "missing": None,
+        "plain": None,
+    }
+
+    def test_renders_numpy_and_pandas_values(self):
+        self.assertEqual(json.loads(FastJSONRenderer().render(self.payload)), self.expected)
+
+    def test_falls_back_to_builtin_conversion_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            body = FastJSONRenderer().render(self.payload)
+
+        # Strict JSON: NaN/inf must not leak through the stdlib encoder
+        self.assertEqual(json.loads(body, parse_constant=self.fail), self.expected)
+
+    def test_to_builtin_returns_plain_python_types(self):
+        out = to_builtin({1: np.array([np.int64(2)]), "s": pd.Series([0.5, np.nan])})
+
+        self.assertEqual(out, {"1": [2], "s": [0.5, None]})
+        self.assertIs(type(out["1"][0]), int)
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class QueryBatchViewTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        self._use_synthetic_dataset(areas=["wakad", "aundh", "baner"], rows_per_year=2)
+
+    def _post(self, url, body):
+        return self.client.post(url, json.dumps(body), content_type="application/json")
+
+    def _batch(self, queries):
+        response = self._post("/api/query/batch/", {"queries": queries})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_keeps_request_order_across_year_windows(self):
+        results = self._batch(["analyze wakad since 2020", "analyze aundh", "analyze baner since 2020", "analyze wakad"])
+
+        self.assertEqual([r["result"]["area"] for r in results], ["Wakad", "Aundh", "Baner", "Wakad"])
+        self.assertEqual(min(row["year"] for row in results[0]["result"]["table"]), 2020)
+        self.assertEqual(min(row["year"] for row in results[3]["result"]["table"]), 2015)
+
+    def test_reports_errors_per_item(self):
+        results = self._batch(["analyze wakad", "", {"query": "analyze wakad since 2099"}, "compare aundh and baner"])
+
+        self.assertEqual([r["status"] for r in results], [200, 400, 404, 200])
+        self.assertEqual(results[1]["error"], "query field is required.")
+        self.assertIn("No data found for Wakad", results[2]["error"])
+        self.assertEqual(results[3]["result"]["comparison_areas"], ["Aundh", "Baner"])
+
+    def test_rejects_bad_query_lists(self):
+        for queries in (None, "analyze wakad", [], ["analyze wakad"] * (MAX_BATCH_QUERIES + 1)):
+            with self.subTest(queries=queries if not isinstance(queries, list) else len(queries)):
+                response = self._post("/api/query/batch/", {"queries": queries})
+                self.assertEqual(response.status_code, 400)
+
+    def test_matches_query_view_payload(self):
+        queries = ["analyze wakad since 2020", "compare wakad and aundh demand trends"]
+        results = self._batch(queries)
+
+        for query, result in zip(queries, results):
+            single = self._post("/api/query/", {"query": query})
+            self.assertEqual(single.status_code, 200)
+            self.assertEqual(result["result"], single.json())
+
+    def test_reports_dataset_version(self):
+        response = self._post("/api/query/batch/", {"queries": ["analyze wakad"]})
+
+        self.assertTrue(response.json()["dataset_version"].startswith("dataset.csv@"))
+
+
+class QueryStreamTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        # 3 areas x 10 years x 2 rows: 20 rows per area
+        self._use_synthetic_dataset(areas=["wakad", "aundh", "baner"], rows_per_year=2)
+
+    def _post(self, body):
+        return self.client.post("/api/query/", json.dumps(body), content_type="application/json")
+
+    def _stream(self, query, **extra):
+        response = self._post({"query": query, "stream": "ndjson", **extra})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_single_area_event_order_and_pages(self):
+        events = self._stream("analyze wakad", page_size=8)
+
+        self.assertEqual(
+            [e["event"] for e in events],
+            ["intent", "chart", "summary", "table", "table", "table", "done"],
+        )
+        self.assertEqual(events[0]["data"]["areas"], ["Wakad"])
+        pages = [e["data"] for e in events if e["event"] == "table"]
+        self.assertEqual([p["page"] for p in pages], [0, 1, 2])
+        self.assertEqual([len(p["rows"]) for p in pages], [8, 8, 4])
+
+        plain = self._post({"query": "analyze wakad"}).json()
+        self.assertEqual([row for p in pages for row in p["rows"]], plain["table"])
+        self.assertEqual(events[1]["data"]["chart"], plain["chart"])
+
+    def test_comparison_event_order(self):
+        events = self._stream("compare wakad and baner")
+
+        self.assertEqual([e["event"] for e in events], ["intent", "chart", "chart", "summary", "done"])
+        self.assertEqual([e["data"]["area"] for e in events[1:3]], ["Wakad", "Baner"])
+        self.assertEqual(events[3]["data"]["comparison_areas"], ["Wakad", "Baner"])
+
+    def test_no_data_yields_error_event(self):
+        events = self._stream("analyze wakad since 2099")
+
+        self.assertEqual([e["event"] for e in events], ["intent", "error"])
+        self.assertIn("No data found for Wakad", events[1]["data"]["error"])
+
+    def test_failure_mid_stream_yields_error_event(self):
+        with mock.patch("api.views.generate_summary", side_effect=RuntimeError("boom")):
+            events = self._stream("analyze wakad")
+
+        self.assertEqual([e["event"] for e in events], ["intent", "chart", "error"])
+        self.assertEqual(events[-1]["data"]["error"], "Query failed: boom")
+
+    def test_sse_framing(self):
+        response = self._post({"query": "analyze wakad", "stream": "sse"})
+        body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertTrue(body.startswith("event: intent\ndata: {"))
+        self.assertTrue(body.endswith("event: done\ndata: {}\n\n"))
+
+    def test_validates_stream_and_page_size(self):
+        self.assertEqual(self._post({"query": "analyze wakad", "stream": "xml"}).status_code, 400)
+        for page_size in (0, -5, "abc"):
+            with self.subTest(page_size=page_size):
+                response = self._post({"query": "analyze wakad", "stream": "ndjson", "page_size": page_size})
+                self.assertEqual(response.status_code, 400)
+
+    def test_page_size_ignored_without_stream(self):
+        response = self._post({"query": "analyze wakad", "page_size": "abc"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["area"], "Wakad")
@@ -27,6 +27,10 @@ def _find_demand_column(df: pd.DataFrame):
                 return found
     return None
 
+def _round_series(series: pd.Series) -> list:
+    """Rounds to 2 decimals with Python's round() (pandas breaks ties differently); NaN -> None."""
+    return [None if pd.isna(x) else round(x, 2) for x in series.tolist()]
+
 def build_chart_json(df: pd.DataFrame) -> dict:
     """
     Aggregates filtered data by year to create time series data for the frontend chart.
@@ -37,6 +41,7 @@ def build_chart_json(df: pd.DataFrame) -> dict:
        "rates": {"flat": [...], "overall": [...]},
        "demand": [...]
      }
+    Demand is a NumPy array; FastJSONRenderer serializes it directly.
     """
     if df is None or df.empty:
         return {"years": [], "rates": {}, "demand": []}
@@ -76,19 +81,11 @@ def build_chart_json(df: pd.DataFrame) -> dict:
             years = grouped_rates[year_col].astype(str).tolist()
 
             for rate_type, colname in present_rates.items():
-                series = [None if pd.isna(x) else round(float(x), 2) for x in grouped_rates[colname].tolist()]
-                rates_output[rate_type] = series
+                rates_output[rate_type] = _round_series(grouped_rates[colname])
 
-            # Calculate overall average across all valid rate columns per year
-            overall_series = []
-            for _, row in grouped_rates.iterrows():
-                vals = []
-                for colname in present_rates.values():
-                    v = row.get(colname)
-                    if pd.notna(v):
-                        vals.append(float(v))
-                overall_series.append(round(sum(vals)/len(vals), 2) if vals else None)
-            rates_output['overall'] = overall_series
+            # Calculate overall average across all valid rate columns per year (NaNs skipped)
+            overall = grouped_rates[list(present_rates.values())].mean(axis=1, skipna=True)
+            rates_output['overall'] = _round_series(overall)
         else:
             years = []
     else:
@@ -108,7 +105,7 @@ def build_chart_json(df: pd.DataFrame) -> dict:
             merged_df = pd.DataFrame({year_col: grouped_rates[year_col].unique()})
             merged_df = merged_df.merge(grouped_demand, on=year_col, how='left')
             
-            demand_series = [int(x) if pd.notna(x) else 0 for x in merged_df[demand_col].tolist()]
+            demand_series = merged_df[demand_col].fillna(0).astype('int64').to_numpy()
         except Exception:
             demand_series = [0] * len(years) 
     elif years:
@@ -3,6 +3,14 @@ from pathlib import Path
 import warnings
 from datetime import datetime
 import os 
+import io
+import time
+import zipfile
+import atexit
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 # Suppress openpyxl warnings related to merged cells/data validation
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -17,11 +25,34 @@ RATE_COLS = [
 
 # Base path structure
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-DATA_DIR = BASE_DIR / "data"
+# DATASET_DIR lets load tests and deployments point at another data directory
+DATA_DIR = Path(os.getenv("DATASET_DIR", BASE_DIR / "data"))
 
 # File paths for preloaded and uploaded data
 PRELOADED_PATH = DATA_DIR / "dataset.xlsx"
-UPLOADED_PATH = DATA_DIR / "uploaded_dataset.xlsx" # DYNAMIC FILE PATH
+
+# Multi-file sources: a directory or a zip of workbooks/CSVs (e.g. one per city or year)
+PRELOADED_DIR = DATA_DIR / "dataset"
+UPLOADED_DIR = DATA_DIR / "uploaded_dataset"
+
+DATA_SUFFIXES = ('.xlsx', '.xls', '.csv')
+
+# Uploads keep their original type: uploaded_dataset.xlsx / .xls / .csv / .zip
+UPLOADED_PATHS = tuple(DATA_DIR / f"uploaded_dataset{suffix}" for suffix in DATA_SUFFIXES + ('.zip',))
+
+# Process pool size for parsing sheets/files; 1 disables the pool. The default is
+# kept small because every gunicorn worker process gets its own pool.
+INGEST_WORKERS = int(os.getenv('DATASET_INGEST_WORKERS', str(min(4, os.cpu_count() or 1))))
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+# Last loaded dataset, keyed by its source version, so requests only re-read
+# (and re-dispatch through the pool) when the source actually changes
+_DATASET_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+# How often load_dataset() re-reads a source that changed while it was being read
+LOAD_ATTEMPTS = 3
 
 def _normalize_cols(df: pd.DataFrame) -> pd.DataFrame:
     """Normalizes column names to lowercase, stripped, and replaces hyphens/underscores with spaces."""
@@ -30,41 +61,309 @@ def _normalize_cols(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = [str(c).strip().lower().replace('-', ' ').replace('_', ' ') for c in df.columns]
     return df
 
+def _source_mtime_ns(path: Path) -> int:
+    """
+    Modification time of a dataset source; for directories, of the newest
+    file inside or of the directory itself (which changes when files are removed).
+    """
+    if path.is_dir():
+        return max([path.stat().st_mtime_ns] + [p.stat().st_mtime_ns for p in path.iterdir() if p.is_file()])
+    return path.stat().st_mtime_ns
+
+def _resolve_source() -> Path:
+    """
+    Picks the dataset source to load: the most recently modified upload
+    (file, zip or directory) if any exists, otherwise the preloaded data.
+    """
+    uploaded = [p for p in UPLOADED_PATHS + (UPLOADED_DIR,) if p.exists()]
+    if uploaded:
+        return max(uploaded, key=_source_mtime_ns)
+    return next((p for p in (PRELOADED_PATH, PRELOADED_DIR) if p.exists()), PRELOADED_PATH)
+
+def _file_stamp(st: os.stat_result) -> str:
+    """Identifies one file's contents: inode (changes on os.replace) plus mtime."""
+    return f"{st.st_ino}-{st.st_mtime_ns}"
+
+def _dir_stamp(stamps: list) -> str:
+    return hashlib.sha1("|".join(stamps).encode()).hexdigest()[:16]
+
+def _dir_files(path: Path) -> list:
+    return sorted(p for p in path.iterdir() if p.is_file() and _is_data_file(p.name))
+
+def _source_version(path: Path) -> str:
+    """
+    Cheap (stat-only) version of a source, e.g. 'dataset.xlsx@1234-1700000000000000000'.
+    Matches the version _snapshot_source() reports for the same unchanged data.
+    """
+    try:
+        if path.is_dir():
+            return f"{path.name}@" + _dir_stamp([f"{p.name}:{_file_stamp(p.stat())}" for p in _dir_files(path)])
+        return f"{path.name}@{_file_stamp(path.stat())}"
+    except OSError:
+        return f"{path.name}@missing"
+
+def _read_file(path: Path):
+    """Reads a file through one descriptor; returns (bytes, stamp of exactly those bytes)."""
+    with open(path, "rb") as fh:
+        st = os.fstat(fh.fileno())
+        return fh.read(), _file_stamp(st)
+
+def _snapshot_source(path: Path):
+    """
+    Reads a source's bytes once, so every part of a load comes from the same
+    data even if an upload replaces the file mid-load.
+    Returns (version, [(name, bytes)]); zip sources are returned whole.
+    """
+    if path.is_dir():
+        files, stamps = [], []
+        for p in _dir_files(path):
+            data, stamp = _read_file(p)
+            files.append((p.name, data))
+            stamps.append(f"{p.name}:{stamp}")
+        return f"{path.name}@{_dir_stamp(stamps)}", files
+
+    data, stamp = _read_file(path)
+    return f"{path.name}@{stamp}", [(path.name, data)]
+
+def _excel_engine(suffix: str):
+    """openpyxl for .xlsx; let pandas pick the reader for legacy .xls."""
+    return "openpyxl" if suffix == ".xlsx" else None
+
+def _is_data_file(name: str) -> bool:
+    """True for spreadsheet files we can read, skipping Office lock files and hidden entries."""
+    base = Path(name).name
+    return Path(name).suffix.lower() in DATA_SUFFIXES and not base.startswith(("~$", ".", "__MACOSX"))
+
+def _list_sheets(source, suffix: str) -> list:
+    """Returns sheet names for an Excel file (path or file-like); CSVs have one unnamed part."""
+    if suffix == ".csv":
+        return [None]
+    with pd.ExcelFile(source, engine=_excel_engine(suffix)) as xl:
+        return list(xl.sheet_names)
+
+def _list_parts(files: list) -> list:
+    """
+    Expands snapshotted (name, bytes) files into (label, bytes, sheet) parts:
+    every sheet of a workbook, every data file inside a zip.
+    """
+    parts = []
+    for name, data in files:
+        suffix = Path(name).suffix.lower()
+        if suffix in DATA_SUFFIXES:
+            # Checked before the zip branch: an .xlsx is itself a zip archive
+            try:
+                sheets = _list_sheets(io.BytesIO(data), suffix)
+            except Exception:
+                # Unreadable workbook: keep it as one part so reading it reports the error
+                sheets = [0]
+            parts.extend((name, data, sheet) for sheet in sheets)
+        elif suffix == ".zip":
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                for member in sorted(n for n in zf.namelist() if not n.endswith("/") and _is_data_file(n)):
+                    parts.extend(_list_parts([(f"{name}/{member}", zf.read(member))]))
+    return parts
+
+def _part_label(part) -> str:
+    name, _, sheet = part
+    return f"{name}[{sheet}]" if sheet is not None else name
+
+def _read_part(part):
+    """
+    Reads and normalizes one sheet/file from its bytes. Runs inside the process
+    pool, so it must stay a module-level function. Returns (df or None, seconds, error).
+    """
+    name, data, sheet = part
+    start = time.perf_counter()
+    try:
+        suffix = Path(name).suffix.lower()
+        if suffix == ".csv":
+            df = pd.read_csv(io.BytesIO(data))
+        else:
+            df = pd.read_excel(io.BytesIO(data), sheet_name=sheet, engine=_excel_engine(suffix))
+        return _normalize_cols(df), time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, str(e)
+
+def _get_executor():
+    """
+    Lazily creates one process pool per server process and reuses it across loads.
+    Workers are started via forkserver/spawn, never fork: loads run inside
+    threaded request handlers, where forking the whole process is unsafe.
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _EXECUTOR = ProcessPoolExecutor(max_workers=max(1, INGEST_WORKERS), mp_context=context)
+        return _EXECUTOR
+
+def _shutdown_executor():
+    """Stops the pool (if any); the next parallel load starts a fresh one."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+
+atexit.register(_shutdown_executor)
+
+def _read_parts(parts: list) -> list:
+    """Reads parts in parallel when there is more than one, sequentially otherwise."""
+    if len(parts) <= 1 or INGEST_WORKERS == 1:
+        return [_read_part(p) for p in parts]
+    try:
+        return list(_get_executor().map(_read_part, parts))
+    except Exception as e:
+        # e.g. a broken pool or a platform without process support; drop the
+        # pool so the next load gets a fresh one instead of failing forever
+        print(f"Parallel ingestion failed ({e}); reading parts sequentially.")
+        _shutdown_executor()
+        return [_read_part(p) for p in parts]
+
+def validate_dataset_source(path: Path):
+    """
+    Fully parses a candidate source (e.g. an upload before it is swapped in)
+    without caching it. Returns an error message, or None if it is usable.
+    """
+    try:
+        _, files = _snapshot_source(path)
+        parts = _list_parts(files)
+    except Exception as e:
+        return f"Could not read file: {e}"
+    if not parts:
+        return "No readable sheets or files found."
+
+    frames = []
+    for part, (part_df, _, error) in zip(parts, _read_parts(parts)):
+        if error:
+            return f"Could not read {_part_label(part)}: {error}"
+        frames.append(part_df)
+
+    if all(f.empty for f in frames):
+        return "Dataset is empty."
+    if not any("final location" in f.columns for f in frames):
+        return "Dataset missing 'final location' column."
+    return None
+
 def load_dataset() -> pd.DataFrame:
     """
     Loads dataset. Returns empty DataFrame on failure.
-    PRIORITIZES the UPLOADED file, then falls back to the PRELOADED file.
+    PRIORITIZES the UPLOADED source, then falls back to the PRELOADED one.
+    The parsed dataset is cached per source version (inode + mtime), so only the
+    first request after a change pays for parsing; callers get their own copy.
     """
-    df = pd.DataFrame()
-    
-    # 1. Try UPLOADED file first
-    if UPLOADED_PATH.exists():
-        path_to_load = UPLOADED_PATH
+    path_to_load = _resolve_source()
+    with _CACHE_LOCK:
+        cached = _DATASET_CACHE.get(_source_version(path_to_load))
+    if cached is not None:
+        return cached.copy()
+
+    for _ in range(LOAD_ATTEMPTS):
+        df, complete, source = _read_dataset(path_to_load)
+        if df.empty:
+            return df
+        # If the source changed while we read it (e.g. one file of a directory
+        # was replaced), the snapshot may mix versions: read the new one instead
+        current = _resolve_source()
+        if current == path_to_load and _source_version(source) == df.attrs["dataset_version"]:
+            break
+        print(f"Dataset {path_to_load.name} changed during load; reloading.")
+        path_to_load = current
     else:
-        path_to_load = PRELOADED_PATH
+        # Still changing after several attempts: serve the last read, uncached
+        return df
+
+    # Never cache partial loads, so the next request retries the failed parts
+    if complete:
+        with _CACHE_LOCK:
+            _DATASET_CACHE.clear()
+            _DATASET_CACHE[df.attrs["dataset_version"]] = df
+        return df.copy()
+    return df
+
+def _read_dataset(path_to_load: Path):
+    """
+    Parses the dataset at path_to_load from a single snapshot of its bytes.
+    A source may be a workbook (every sheet is read), a directory or a zip of
+    files; parts are read in parallel and concatenated. Per-part timings are
+    printed and kept in df.attrs["load_timings"]; the version of the bytes
+    actually read is kept in df.attrs["dataset_version"].
+    Returns (df, complete, source): complete is False if any part failed and
+    source is the path the bytes came from (the " - Sheet1.csv" fallback may differ).
+    """
+    df = pd.DataFrame()
+    version = None
+    complete = True
+    source = path_to_load
 
     print(f"Attempting to load data from: {path_to_load.name}")
-    
-    # Try .xlsx
-    if path_to_load.exists() and path_to_load.suffix in ['.xlsx', '.xls']:
+
+    timings = []
+    if path_to_load.exists():
         try:
-            df = pd.read_excel(path_to_load, engine="openpyxl")
+            version, files = _snapshot_source(path_to_load)
+            parts = _list_parts(files)
         except Exception as e:
-            print(f"Error reading XLSX dataset {path_to_load.name}: {e}")
-            
+            print(f"Error listing dataset parts in {path_to_load.name}: {e}")
+            parts, complete = [], False
+
+        frames = []
+        for part, (part_df, seconds, error) in zip(parts, _read_parts(parts)):
+            label = _part_label(part)
+            if error:
+                print(f"Error reading dataset part {label}: {error}")
+                complete = False
+                continue
+            print(f"Loaded {label}: {len(part_df)} rows in {seconds:.3f}s")
+            timings.append({"part": label, "rows": len(part_df), "seconds": round(seconds, 4)})
+            if not part_df.empty:
+                frames.append(part_df)
+
+        if frames:
+            df = pd.concat(frames, ignore_index=True, sort=False)
+
     # Fallback to CSV (assuming similar naming convention if CSV was used)
-    csv_path = path_to_load.with_name(path_to_load.stem + " - Sheet1.csv") 
+    csv_path = path_to_load.with_name(path_to_load.stem + " - Sheet1.csv")
     if df.empty and csv_path.exists():
         try:
-            df = pd.read_csv(csv_path)
+            data, stamp = _read_file(csv_path)
+            df = _normalize_cols(pd.read_csv(io.BytesIO(data)))
+            version, source = f"{csv_path.name}@{stamp}", csv_path
         except Exception as e:
             print(f"Error reading CSV dataset {csv_path.name}: {e}")
-            
+
     if df.empty:
         print(f"Error: No valid dataset found in the 'data' directory.")
-        return pd.DataFrame()
+        return pd.DataFrame(), False, source
+
+    df.attrs["load_timings"] = timings
+    df.attrs["dataset_version"] = version
+    return df, complete, source
+
+def filter_year_window(df: pd.DataFrame, min_year: int = None, max_year: int = None) -> pd.DataFrame:
+    """
+    Cleans the area column and applies the year range to the whole dataset in one pass.
+    Mirrors the area/year steps of filter_area_data() so results are identical.
+    """
+    area_col = next((c for c in df.columns if c == "final location"), None)
+    if area_col is None:
+        raise KeyError("Dataset missing 'final location' column (after normalization)")
+
+    df = df.copy()
+    df[area_col] = df[area_col].astype(str).str.strip()
+
+    year_col = next((c for c in df.columns if c == "year"), None)
+    if year_col:
+        try:
+            df[year_col] = pd.to_numeric(df[year_col], errors="coerce").astype('Int64')
+        except Exception:
+            pass
+        if min_year is not None:
+            df = df[df[year_col] >= min_year]
+        if max_year is not None:
+            df = df[df[year_col] <= max_year]
 
-    df = _normalize_cols(df)
     return df
 
 def filter_area_data(
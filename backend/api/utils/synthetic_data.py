@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from .excel_reader import RATE_COLS
+
+DEFAULT_AREAS = ['wakad', 'aundh', 'ambegaon budruk', 'akurdi', 'baner', 'hinjewadi']
+
+
+def make_synthetic_dataset(
+    areas: list = None,
+    start_year: int = 2015,
+    end_year: int = 2024,
+    rows_per_year: int = 20,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Builds a DataFrame shaped like the source real estate workbook
+    (same 'final location', 'year', rate and demand columns) for benchmarks
+    and load tests. Deterministic for a given seed.
+    """
+    areas = areas or DEFAULT_AREAS
+    rng = np.random.default_rng(seed)
+    years = np.arange(start_year, end_year + 1)
+
+    n = len(areas) * len(years) * rows_per_year
+    df = pd.DataFrame({
+        'final location': np.repeat(areas, len(years) * rows_per_year),
+        'year': np.tile(np.repeat(years, rows_per_year), len(areas)),
+        'city': 'pune',
+        'loc_lat': rng.uniform(18.4, 18.7, n).round(6),
+        'loc_lng': rng.uniform(73.7, 74.0, n).round(6),
+    })
+
+    growth = (df['year'] - start_year).to_numpy()
+    for i, col in enumerate(RATE_COLS):
+        base = 5000 + 1500 * i
+        rates = base * (1.05 ** growth) + rng.normal(0, 400, n)
+        # Leave a few gaps like the real workbook has
+        rates[rng.random(n) < 0.05] = np.nan
+        df[col] = rates.round(2)
+
+    df['total sold - igr'] = rng.integers(0, 400, n)
+    df['total units'] = df['total sold - igr'] + rng.integers(0, 200, n)
+    return df
@@ -1,15 +1,27 @@
+import os
 import re
+import tempfile
+from pathlib import Path
 from difflib import get_close_matches
 from datetime import datetime
 import pandas as pd
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.files.storage import FileSystemStorage
 
-from .utils.excel_reader import load_dataset, filter_area_data, UPLOADED_PATH
+from .utils.excel_reader import (
+    load_dataset, filter_year_window,
+    validate_dataset_source, DATA_DIR
+)
 from .utils.chart_utils import build_chart_json
 from .utils.summary_generator import generate_summary
+from .streaming import STREAM_FORMATS, stream_events
+
+# Upper bound on queries accepted by query_batch_view in one request
+MAX_BATCH_QUERIES = 100
+
+# Rows per 'table' event when query_view streams its response
+TABLE_PAGE_SIZE = 200
 
 def _extract_time_filter(query_text: str):
     """Parses query for time constraints (e.g., 'last 3 years')."""
@@ -33,9 +45,13 @@ def _extract_time_filter(query_text: str):
     return min_year, max_year
 
 
-def _extract_matched_areas(query_text: str, df: pd.DataFrame, area_col: str) -> list:
+def _known_areas(df: pd.DataFrame, area_col: str) -> list:
+    """Lowercased area names in the dataset, for matching against queries."""
+    return [str(a).strip().lower() for a in df[area_col].unique() if pd.notna(a)]
+
+
+def _extract_matched_areas(query_text: str, all_areas: list) -> list:
     """Extracts unique areas from the query text using fuzzy matching."""
-    all_areas = [str(a).strip().lower() for a in df[area_col].unique() if pd.notna(a)]
     matched_areas = []
 
     # Simple check for direct presence
@@ -57,18 +73,159 @@ def _extract_matched_areas(query_text: str, df: pd.DataFrame, area_col: str) ->
     return list(dict.fromkeys(matched_areas))
 
 
+def _parse_query(query_text: str, all_areas: list):
+    """Extracts (matched_areas, min_year, max_year) from a lowercased query."""
+    matched_areas = _extract_matched_areas(query_text, all_areas)
+    min_year, max_year = _extract_time_filter(query_text)
+
+    # Fallback to default area if nothing is matched
+    if not matched_areas:
+         matched_areas.append("Wakad")
+
+    return matched_areas, min_year, max_year
+
+
+def _area_lookup(df: pd.DataFrame, min_year, max_year):
+    """
+    Returns get_area_df(area) -> that area's rows within the year window.
+    The window is applied to the dataset once; each area is then masked out
+    only when first requested, so the first chart does not wait on other areas.
+    """
+    windowed = filter_year_window(df, min_year=min_year, max_year=max_year)
+    keys = windowed["final location"].str.lower()
+    frames = {}
+
+    def get_area_df(area):
+        key = str(area).lower()
+        if key not in frames:
+            frames[key] = windowed[keys == key].copy()
+        return frames[key]
+
+    return get_area_df
+
+
+def _iter_query_events(matched_areas: list, min_year, max_year, get_area_df, use_llm: bool = False, page_size: int = None):
+    """
+    Yields (event, data) pairs for one parsed query, cheapest-first:
+    the parsed intent, each area's chart as soon as it is built, then the
+    summary, then the table (in page_size pages, or one page if None), then 'done'.
+    A failure yields a single 'error' event instead of the remaining events.
+    """
+    comparison = len(matched_areas) > 1
+    yield "intent", {
+        "mode": "comparison" if comparison else "single",
+        "areas": [a.title() for a in matched_areas],
+        "min_year": min_year,
+        "max_year": max_year,
+    }
+
+    # --- SINGLE AREA ANALYSIS (Default path) ---
+    if not comparison:
+        matched_area = matched_areas[0]
+        filtered_df = get_area_df(matched_area)
+
+        if filtered_df.empty:
+            yield "error", {"error": f"No data found for {matched_area.title()} within the specified time range."}
+            return
+
+        yield "chart", {"area": matched_area.title(), "chart": build_chart_json(filtered_df)}
+        yield "summary", {"summary": generate_summary(matched_area, filtered_df, use_llm=use_llm)}
+
+        table = filtered_df.fillna("")
+        total = len(table)
+        step = page_size or max(total, 1)
+        for start in range(0, total, step):
+            yield "table", {
+                "page": start // step,
+                "total_rows": total,
+                "rows": table.iloc[start:start + step].to_dict(orient="records"),
+            }
+        yield "done", {}
+        return
+
+    # --- MULTI-AREA COMPARISON LOGIC ---
+    areas_with_data = []
+    for area in matched_areas:
+        filtered_df = get_area_df(area)
+
+        # Only include areas that actually have data
+        if not filtered_df.empty:
+            areas_with_data.append(area.title())
+            yield "chart", {"area": area.title(), "chart": build_chart_json(filtered_df)}
+
+    if not areas_with_data:
+        yield "error", {"error": "No data found for the areas specified in the comparison query."}
+        return
+
+    yield "summary", {
+        "comparison_areas": areas_with_data,
+        "summary": f"Comparison analysis for: {', '.join(areas_with_data)}",
+    }
+    yield "done", {}
+
+
+def _build_query_response(events):
+    """
+    Collects _iter_query_events() output into the single JSON body that
+    non-streamed clients expect. Returns (payload, status_code).
+    """
+    charts, summary, table = [], {}, []
+    for event, data in events:
+        if event == "error":
+            return data, status.HTTP_404_NOT_FOUND
+        if event == "chart":
+            charts.append(data)
+        elif event == "summary":
+            summary = data
+        elif event == "table":
+            table.extend(data["rows"])
+
+    if "comparison_areas" not in summary:
+        # Original single-output JSON structure
+        return {
+            "area": charts[0]["area"],
+            "summary": summary["summary"],
+            "chart": charts[0]["chart"],
+            "table": table
+        }, status.HTTP_200_OK
+
+    # Return comparison structure (Frontend uses 'multi_chart_data')
+    return {
+        "comparison_areas": summary["comparison_areas"],
+        "summary": summary["summary"],
+        "multi_chart_data": charts,
+        "table": [], # Comparison usually omits the detailed table
+    }, status.HTTP_200_OK
+
+
 @api_view(['POST'])
 def query_view(request):
     """
     Handles queries for single area analysis, comparison, and time filtering.
+    Pass "stream": "ndjson" or "sse" to receive the result progressively
+    (intent, charts, summary, table pages) instead of one JSON body.
     """
     data = request.data
     query_text = (data.get("query") or "").strip().lower()
     use_llm = bool(data.get("use_llm", False))
+    stream_format = data.get("stream") or request.query_params.get("stream")
 
     if not query_text:
         return Response({"error": "query field is required."}, status=status.HTTP_400_BAD_REQUEST)
 
+    if stream_format and stream_format not in STREAM_FORMATS:
+        return Response({"error": f"stream must be one of: {', '.join(STREAM_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # page_size only applies to streamed tables; ignore it otherwise as before
+    page_size = None
+    if stream_format:
+        try:
+            page_size = int(data.get("page_size", TABLE_PAGE_SIZE))
+        except (TypeError, ValueError):
+            page_size = 0
+        if page_size <= 0:
+            return Response({"error": "page_size must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
     df = load_dataset()
     if df is None or df.empty:
         return Response({"error": "Dataset not found or empty. Please upload a file first."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -79,70 +236,86 @@ def query_view(request):
     if area_col is None:
         return Response({"error": "Dataset missing 'final location' column."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    # --- 1. PARSE QUERY ---
-    matched_areas = _extract_matched_areas(query_text, df, area_col)
-    min_year, max_year = _extract_time_filter(query_text)
-    
-    # Fallback to default area if nothing is matched
-    if not matched_areas:
-         matched_areas.append("Wakad") 
+    matched_areas, min_year, max_year = _parse_query(query_text, _known_areas(df, area_col))
 
-    # --- 2. SINGLE AREA ANALYSIS (Default path) ---
-    if len(matched_areas) <= 1:
-        matched_area = matched_areas[0]
+    # Apply Area AND Time filtering on the dataset already loaded
+    events = _iter_query_events(
+        matched_areas, min_year, max_year,
+        _area_lookup(df, min_year, max_year),
+        use_llm=use_llm,
+        page_size=page_size
+    )
+    if stream_format:
+        return stream_events(events, stream_format)
 
-        # Apply Area AND Time filtering
-        filtered_df = filter_area_data(
-            matched_area, 
-            min_year=min_year, 
-            max_year=max_year
-        )
-        
-        if filtered_df.empty:
-            return Response({"error": f"No data found for {matched_area.title()} within the specified time range."}, status=status.HTTP_404_NOT_FOUND)
+    payload, status_code = _build_query_response(events)
+    return Response(payload, status=status_code)
 
-        # Original single-output JSON structure
-        chart_data = build_chart_json(filtered_df)
-        summary = generate_summary(matched_area, filtered_df, use_llm=use_llm)
-        table = filtered_df.fillna("").to_dict(orient="records")
-        
-        return Response({
-            "area": matched_area.title(), 
-            "summary": summary, 
-            "chart": chart_data, 
-            "table": table
-        }, status=status.HTTP_200_OK)
 
-    # --- 3. MULTI-AREA COMPARISON LOGIC ---
-    
-    multi_chart_data = []
-    
-    for area in matched_areas:
-        # Apply Area AND Time filtering to each area
-        filtered_df = filter_area_data(
-            area, 
-            min_year=min_year, 
-            max_year=max_year
-        )
-        
-        # Only include areas that actually have data
-        if not filtered_df.empty:
-            chart = build_chart_json(filtered_df)
-            multi_chart_data.append({
-                "area": area.title(),
-                "chart": chart,
-            })
-        
-    if not multi_chart_data:
-        return Response({"error": "No data found for the areas specified in the comparison query."}, status=status.HTTP_404_NOT_FOUND)
+@api_view(['POST'])
+def query_batch_view(request):
+    """
+    Answers many queries in one round-trip (e.g. dashboard prefetch).
+    The dataset is loaded once, so every query sees the same version; queries
+    sharing a year window also share one filtering and grouping pass.
+    Results come back in request order, with per-item errors.
+    """
+    data = request.data
+    queries = data.get("queries")
+    default_use_llm = bool(data.get("use_llm", False))
 
-    # Return comparison structure (Frontend uses 'multi_chart_data')
-    return Response({
-        "comparison_areas": [d['area'] for d in multi_chart_data],
-        "summary": f"Comparison analysis for: {', '.join([d['area'] for d in multi_chart_data])}",
-        "multi_chart_data": multi_chart_data,
-        "table": [], # Comparison usually omits the detailed table
-    }, status=status.HTTP_200_OK)
+    if not isinstance(queries, list) or not queries:
+        return Response({"error": "queries must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(queries) > MAX_BATCH_QUERIES:
+        return Response({"error": f"At most {MAX_BATCH_QUERIES} queries are allowed per batch."}, status=status.HTTP_400_BAD_REQUEST)
+
+    df = load_dataset()
+    if df is None or df.empty:
+        return Response({"error": "Dataset not found or empty. Please upload a file first."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    version = df.attrs.get("dataset_version")
+
+    area_col = next((c for c in df.columns if c == "final location"), None)
+    if area_col is None:
+        return Response({"error": "Dataset missing 'final location' column."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    # Built once and shared by every query's area matching
+    all_areas = _known_areas(df, area_col)
+    results = [None] * len(queries)
+    groups = {}
+
+    # --- 1. PARSE every query and group by year window ---
+    for i, item in enumerate(queries):
+        if isinstance(item, dict):
+            raw, use_llm = item.get("query"), bool(item.get("use_llm", default_use_llm))
+        else:
+            raw, use_llm = item, default_use_llm
+
+        query_text = (raw if isinstance(raw, str) else "").strip().lower()
+        if not query_text:
+            results[i] = {"query": raw, "status": status.HTTP_400_BAD_REQUEST, "error": "query field is required."}
+            continue
+
+        matched_areas, min_year, max_year = _parse_query(query_text, all_areas)
+        groups.setdefault((min_year, max_year), []).append((i, raw, matched_areas, use_llm))
+
+    # --- 2. EXECUTE each group against one shared scan of the dataset ---
+    for (min_year, max_year), items in groups.items():
+        get_area_df = _area_lookup(df, min_year, max_year)
+
+        for i, raw, matched_areas, use_llm in items:
+            try:
+                payload, status_code = _build_query_response(
+                    _iter_query_events(matched_areas, min_year, max_year, get_area_df, use_llm=use_llm)
+                )
+            except Exception as e:
+                payload, status_code = {"error": f"Query failed: {e}"}, status.HTTP_500_INTERNAL_SERVER_ERROR
+
+            if status_code == status.HTTP_200_OK:
+                results[i] = {"query": raw, "status": status_code, "result": payload}
+            else:
+                results[i] = {"query": raw, "status": status_code, "error": payload["error"]}
+
+    return Response({"dataset_version": version, "results": results}, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -153,16 +326,36 @@ def upload_dataset_view(request):
     
     uploaded_file = request.FILES['file']
     
-    if not uploaded_file.name.endswith(('.xlsx', '.xls', '.csv')):
-        return Response({"error": "Invalid file type. Only Excel (.xlsx, .xls) and CSV are supported."}, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Use FileSystemStorage to save the file, renaming it to UPLOADED_PATH
-    fs = FileSystemStorage(location=UPLOADED_PATH.parent)
+    if not uploaded_file.name.lower().endswith(('.xlsx', '.xls', '.csv', '.zip')):
+        return Response({"error": "Invalid file type. Only Excel (.xlsx, .xls), CSV and zip archives of them are supported."}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Save the file with the standard uploaded filename, overwriting any previous upload
-    filename = fs.save(UPLOADED_PATH.name, uploaded_file)
+    # Keep the original type (uploaded_dataset.csv, .zip, ...) so the loader picks the right reader;
+    # zip archives (many workbooks/CSVs) are expanded at load time
+    target_path = DATA_DIR / ("uploaded_dataset" + Path(uploaded_file.name).suffix.lower())
+
+    # Write to a hidden temp file next to the target, then atomically swap it in,
+    # so concurrent readers see either the previous dataset or the new one, never a partial file
+    tmp_fd, tmp_name = tempfile.mkstemp(dir=target_path.parent, prefix=".upload-", suffix=target_path.suffix)
+    try:
+        with os.fdopen(tmp_fd, "wb") as tmp:
+            for chunk in uploaded_file.chunks():
+                tmp.write(chunk)
+
+        # Reject files that would not load, so a bad upload can't replace a working dataset
+        error = validate_dataset_source(Path(tmp_name))
+        if error:
+            os.unlink(tmp_name)
+            return Response({"error": f"Invalid dataset {uploaded_file.name}: {error}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # mkstemp creates the file as 0600; give the dataset normal permissions
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, target_path)
+    except Exception as e:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        return Response({"error": f"Could not save uploaded dataset: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    return Response({"message": f"Dataset uploaded successfully: {filename}. Please submit a query to analyze the new data."}, status=status.HTTP_200_OK)
+    return Response({"message": f"Dataset uploaded successfully: {target_path.name}. Please submit a query to analyze the new data."}, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
 def list_areas_view(request):
@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+"""
+Local load and concurrency harness for the API.
+
+Starts the app (in-process on a threaded WSGI server, or under gunicorn)
+against synthetic datasets in a temporary data directory, replays a mix of
+/api/query/, /api/areas/ and /api/upload/ traffic at the requested
+concurrency, and reports throughput and p50/p95/p99 latency per endpoint.
+
+While it runs, an uploader keeps replacing the dataset with rotating
+synthetic versions (two-sheet workbooks and zips of several files). Each
+version has marker areas in two different parts, so every /api/areas/
+response must match exactly one version; anything else (or a 5xx) means a
+response was served from a partially written or mixed dataset.
+
+    python loadtest.py --concurrency 16 --duration 30
+    python loadtest.py --server gunicorn --workers 4 --threads 4
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+# Weighted query mix, roughly what the chatbot and dashboard send
+QUERY_MIX = [
+    (5, "Give me analysis of {a}"),
+    (3, "Show price growth for {a} over the last 3 years"),
+    (2, "Analyze {a} since 2018"),
+    (3, "Compare {a} and {b} demand trends"),
+]
+
+
+def _percentile(sorted_values: list, q: float):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _version_areas(version: int) -> list:
+    """
+    Areas in synthetic dataset `version`: the shared set plus two marker
+    areas that live in different sheets/files of the same version.
+    """
+    from api.utils.synthetic_data import DEFAULT_AREAS
+    return DEFAULT_AREAS + [f"shared marker {version}", f"marker {version}"]
+
+
+def _write_versions(data_dir: Path, versions: int, rows_per_year: int) -> dict:
+    """
+    Writes each synthetic version as a multi-part source and returns
+    {version: (upload filename, bytes)}. Even versions are two-sheet
+    workbooks, odd versions zips of a workbook and a CSV. The shared areas
+    (with one marker) and the second marker are in different parts, so a
+    load that mixes parts of two versions lists a marker pair that no
+    single version has.
+    """
+    import pandas as pd
+    from api.utils.synthetic_data import DEFAULT_AREAS, make_synthetic_dataset
+
+    payloads = {}
+    for v in range(versions):
+        shared = make_synthetic_dataset(areas=DEFAULT_AREAS + [f"shared marker {v}"], rows_per_year=rows_per_year, seed=v)
+        marker = make_synthetic_dataset(areas=[f"marker {v}"], rows_per_year=rows_per_year, seed=v)
+
+        if v % 2 == 0:
+            path = data_dir / f"version_{v}.xlsx"
+            with pd.ExcelWriter(path, engine="openpyxl") as writer:
+                shared.to_excel(writer, sheet_name="Shared", index=False)
+                marker.to_excel(writer, sheet_name="Marker", index=False)
+            payloads[v] = ("dataset.xlsx", path.read_bytes())
+        else:
+            buffer = io.BytesIO()
+            shared.to_excel(buffer, index=False, engine="openpyxl")
+            path = data_dir / f"version_{v}.zip"
+            with zipfile.ZipFile(path, "w") as zf:
+                zf.writestr("shared.xlsx", buffer.getvalue())
+                zf.writestr("marker.csv", marker.to_csv(index=False))
+            payloads[v] = ("dataset.zip", path.read_bytes())
+
+    # Version 0 (a workbook) is what the server starts with
+    (data_dir / "dataset.xlsx").write_bytes(payloads[0][1])
+    return payloads
+
+
+def _multipart(field: str, filename: str, content: bytes):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _request(base_url: str, method: str, path: str, body: bytes = None, content_type: str = None, timeout: float = 60):
+    """Returns (status, parsed JSON body or None, seconds)."""
+    req = urllib.request.Request(base_url + path, data=body, method=method)
+    if content_type:
+        req.add_header("Content-Type", content_type)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            status, raw = resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        status, raw = e.code, e.read()
+    except (urllib.error.URLError, OSError):
+        return None, None, time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    try:
+        return status, json.loads(raw), elapsed
+    except ValueError:
+        return status, None, elapsed
+
+
+class Stats:
+    """Thread-safe latency/status collector, keyed by endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.violations = []
+
+    def record(self, endpoint: str, status, seconds: float):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if status is None or status >= 500:
+                self.errors[endpoint] += 1
+
+    def violation(self, message: str):
+        with self._lock:
+            self.violations.append(message)
+
+
+class InProcessServer:
+    """Serves the Django WSGI app from a threaded wsgiref server in this process."""
+
+    def __init__(self, port: int):
+        from socketserver import ThreadingMixIn
+        from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+        from django.core.wsgi import get_wsgi_application
+
+        class _Server(ThreadingMixIn, WSGIServer):
+            daemon_threads = True
+
+        class _QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        self.httpd = make_server("127.0.0.1", port, get_wsgi_application(), server_class=_Server, handler_class=_QuietHandler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+
+
+class GunicornServer:
+    """Runs the app under gunicorn in a subprocess with the harness environment."""
+
+    def __init__(self, port: int, workers: int, threads: int):
+        self.cmd = [
+            sys.executable, "-m", "gunicorn", "realestate_backend.wsgi:application",
+            "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--threads", str(threads),
+            "--log-level", "warning",
+        ]
+        self.proc = None
+
+    def start(self):
+        self.proc = subprocess.Popen(self.cmd, cwd=BACKEND_DIR, env=os.environ.copy(), stdout=subprocess.DEVNULL)
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            self.proc.wait(timeout=30)
+
+
+def _wait_ready(base_url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, _, _ = _request(base_url, "GET", "/api/areas/", timeout=5)
+        if status == 200:
+            return
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout:.0f}s")
+
+
+def _check_areas(body, valid_area_sets: list, stats: Stats):
+    """Every /api/areas/ response must list exactly one complete dataset version."""
+    areas = sorted(a.lower() for a in (body or {}).get("areas", []))
+    if areas not in valid_area_sets:
+        stats.violation(f"/api/areas/ returned an unknown area set: {areas}")
+
+
+def _run_client(base_url: str, stop_at: float, rng: random.Random, valid_area_sets: list, stats: Stats):
+    """One simulated user: replays the query mix until the deadline."""
+    from api.utils.synthetic_data import DEFAULT_AREAS
+
+    weights, templates = zip(*QUERY_MIX)
+    while time.monotonic() < stop_at:
+        if rng.random() < 0.1:
+            status, body, seconds = _request(base_url, "GET", "/api/areas/")
+            stats.record("/api/areas/", status, seconds)
+            if status == 200:
+                _check_areas(body, valid_area_sets, stats)
+            elif status is not None and status >= 500:
+                # The typical symptom of reading a half-written dataset
+                stats.violation(f"/api/areas/ -> {status}: {(body or {}).get('error')}")
+            continue
+
+        # Only query areas every version has, so a 404 never depends on upload timing
+        a, b = rng.sample(DEFAULT_AREAS, 2)
+        query = rng.choices(templates, weights)[0].format(a=a, b=b)
+        status, body, seconds = _request(
+            base_url, "POST", "/api/query/", json.dumps({"query": query}).encode(), "application/json"
+        )
+        stats.record("/api/query/", status, seconds)
+        if status is not None and status >= 500:
+            stats.violation(f"/api/query/ {query!r} -> {status}: {(body or {}).get('error')}")
+
+
+def _run_uploader(base_url: str, stop_at: float, interval: float, payloads: dict, stats: Stats):
+    """Keeps replacing the dataset with the next synthetic version while readers are active."""
+    version = 0
+    while time.monotonic() + interval < stop_at:
+        time.sleep(interval)
+        version = (version + 1) % len(payloads)
+        filename, content = payloads[version]
+        body, content_type = _multipart("file", filename, content)
+        status, resp, seconds = _request(base_url, "POST", "/api/upload/", body, content_type)
+        stats.record("/api/upload/", status, seconds)
+        if status != 200:
+            stats.violation(f"/api/upload/ -> {status}: {(resp or {}).get('error')}")
+
+
+def _report(stats: Stats, wall_seconds: float, slo_p95_ms: float, out) -> bool:
+    """Prints the latency table; returns True when the run passed."""
+    out.write(f"\n{'endpoint':<14} {'requests':>8} {'5xx':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}\n")
+    passed = True
+    for endpoint in sorted(stats.latencies):
+        values = sorted(stats.latencies[endpoint])
+        p50, p95, p99 = (_percentile(values, q) * 1000 for q in (0.50, 0.95, 0.99))
+        out.write(
+            f"{endpoint:<14} {len(values):>8} {stats.errors[endpoint]:>5} {len(values) / wall_seconds:>8.1f} "
+            f"{p50:>9.1f} {p95:>9.1f} {p99:>9.1f}\n"
+        )
+        if slo_p95_ms and endpoint != "/api/upload/" and p95 > slo_p95_ms:
+            out.write(f"  SLO breach: {endpoint} p95 {p95:.1f} ms > {slo_p95_ms:.1f} ms\n")
+            passed = False
+
+    if stats.violations:
+        out.write(f"\n{len(stats.violations)} consistency violation(s), e.g.:\n")
+        for message in stats.violations[:10]:
+            out.write(f"  {message}\n")
+        passed = False
+    else:
+        out.write("\nNo responses were served from a partially written or mixed dataset.\n")
+    return passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--server", choices=("inprocess", "gunicorn"), default="inprocess")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--concurrency", type=int, default=8, help="simultaneous simulated users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load")
+    parser.add_argument("--upload-interval", type=float, default=2, help="seconds between dataset replacements (0 disables)")
+    parser.add_argument("--versions", type=int, default=3, help="distinct synthetic dataset versions to rotate through")
+    parser.add_argument("--rows-per-year", type=int, default=20, help="rows per area per year in the synthetic data")
+    parser.add_argument("--slo-p95-ms", type=float, default=0, help="fail if a read endpoint's p95 exceeds this")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    data_dir = Path(tempfile.mkdtemp(prefix="realestate-loadtest-"))
+    try:
+        return _run(args, data_dir)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def _run(args, data_dir: Path) -> int:
+    """Runs one load test with synthetic datasets in data_dir."""
+    # Must be set before Django (and api.utils.excel_reader) is imported
+    os.environ["DATASET_DIR"] = str(data_dir)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "realestate_backend.settings")
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import django
+    django.setup()
+
+    out = sys.stdout
+    print(f"Writing {args.versions} synthetic dataset versions to {data_dir}")
+    payloads = _write_versions(data_dir, args.versions, args.rows_per_year)
+    valid_area_sets = [sorted(_version_areas(v)) for v in range(args.versions)]
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    devnull = None
+    if args.server == "gunicorn":
+        server = GunicornServer(port, args.workers, args.threads)
+    else:
+        server = InProcessServer(port)
+        # The app prints on every dataset load; keep the report readable
+        devnull = open(os.devnull, "w")
+        sys.stdout = devnull
+
+    stats = Stats()
+    server.start()
+    try:
+        _wait_ready(base_url)
+        out.write(f"Running {args.concurrency} clients for {args.duration:.0f}s against {args.server} server at {base_url}\n")
+
+        start = time.monotonic()
+        stop_at = start + args.duration
+        with ThreadPoolExecutor(max_workers=args.concurrency + 1) as pool:
+            futures = [
+                pool.submit(_run_client, base_url, stop_at, random.Random(args.seed + i), valid_area_sets, stats)
+                for i in range(args.concurrency)
+            ]
+            if args.upload_interval > 0 and args.versions > 1:
+                futures.append(pool.submit(_run_uploader, base_url, stop_at, args.upload_interval, payloads, stats))
+            for future in futures:
+                future.result()
+        wall_seconds = time.monotonic() - start
+    finally:
+        server.stop()
+        sys.stdout = out
+        if devnull is not None:
+            devnull.close()
+
+    passed = _report(stats, wall_seconds, args.slo_p95_ms, out)
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,6 +33,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    # Negotiated br/gzip compression; must wrap anything that touches the body
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # New: Add CSP Middleware right after Security/Cors
     'csp.middleware.CSPMiddleware', 
@@ -95,10 +97,14 @@ CORS_ALLOW_ALL_ORIGINS = True
 # REST Framework (basic)
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        # orjson-backed when available; serializes NumPy/pandas scalars natively
+        'api.renderers.FastJSONRenderer',
     ],
 }
 
+# Responses smaller than this (in bytes) are sent uncompressed
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+
 # OpenAI key (optional)
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
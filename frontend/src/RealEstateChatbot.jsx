@@ -94,7 +94,7 @@ const FileUpload = ({ setLoading, setNotification }) => {
                 type="file"
                 ref={fileInputRef}
                 onChange={handleFileChange}
-                accept=".xlsx,.xls,.csv"
+                accept=".xlsx,.xls,.csv,.zip"
                 className="hidden"
                 id="file-upload"
                 // The issue here is the disabled prop usage. Fixed in file block.
@@ -102,7 +102,7 @@ const FileUpload = ({ setLoading, setNotification }) => {
             <label htmlFor="file-upload" className="w-full cursor-pointer p-2 rounded-lg text-sm transition duration-200 bg-indigo-600 hover:bg-indigo-700 text-white font-semibold flex justify-center items-center shadow-md">
                 <FaUpload className="w-4 h-4 mr-2" /> Upload New Dataset
             </label>
-            <p className="text-xs text-gray-400 mt-1">Accepts .xlsx, .xls, .csv</p>
+            <p className="text-xs text-gray-400 mt-1">Accepts .xlsx, .xls, .csv, .zip</p>
         </div>
     );
 };
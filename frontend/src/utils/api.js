@@ -10,3 +10,46 @@ export const fetchQuery = async (query) => {
   return res.data;
 };
 
+
+// Sends many queries in one request; results come back in the same order,
+// each as { query, status, result } or { query, status, error }.
+export const fetchQueryBatch = async (queries) => {
+  const res = await axios.post(`${API_BASE}/query/batch/`, {
+    queries,
+    use_llm: false,
+  });
+  return res.data.results;
+};
+
+// Streams a query as NDJSON and calls onEvent(event, data) as each part
+// arrives: "intent", one "chart" per area, "summary", "table" pages, then
+// "done" (or "error").
+export const streamQuery = async (query, onEvent) => {
+  const res = await fetch(`${API_BASE}/query/`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ query, use_llm: false, stream: "ndjson" }),
+  });
+  if (!res.ok) {
+    const body = await res.json().catch(() => ({}));
+    throw new Error(body.error || `Request failed with status ${res.status}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const { event, data } = JSON.parse(line);
+      onEvent(event, data);
+    }
+  }
+};